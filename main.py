@@ -1,16 +1,29 @@
 import csv
 import re
 import logging
-from itertools import islice
+from operator import attrgetter
 
-RE_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+RE_EMAIL = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
 RE_PHONE = re.compile(r'\+?([78])(([\s()-]*\d){10})([(добавчный\.\s]*(\d+))?')
+_RE_NON_DIGIT = re.compile(r'\D')
+_RE_PHONE_FMT = re.compile(r'(\d{3})(\d{3})(\d{2})(\d{2})')
+
+CSV_HEADER = ('lastname', 'firstname', 'surname', 'organization', 'position', 'phone', 'email')
+# projects a contact to a csv row with a single C-level call
+_contact_row = attrgetter('last_name', 'first_name', 'surname', 'org', 'position', 'phone', 'email')
 
 
 class Email:
     """
     The e-mail address, address cannot be changed (__hash__ implemented).
     """
+    __slots__ = ('_address',)
+
     def __init__(self, address: str):
         email_address = address.strip()
         if not self.__class__.is_valid(email_address):
@@ -30,13 +43,23 @@ class Email:
     def __hash__(self):
         return hash(self._address)
 
+    @classmethod
+    def _unchecked(cls, address: str):
+        """
+        :param address: the e-mail address that has already been stripped and validated
+        :return: Email instance created without validation
+        """
+        email = cls.__new__(cls)
+        email._address = address
+        return email
+
     @staticmethod
     def is_valid(address: str):
         """
-        :param address: the e-mail address
+        :param address: the e-mail address without leading and trailing whitespace
         :return: True if e-mail address is correct
         """
-        return RE_EMAIL.match(address.strip())
+        return RE_EMAIL.fullmatch(address)
 
     @staticmethod
     def parse(address: str):
@@ -44,7 +67,10 @@ class Email:
         :param address: the e-mail address
         :return: Email instance if address is correct
         """
-        return Email(address) if Email.is_valid(address) else None
+        address = address.strip()
+        if not Email.is_valid(address):
+            return None
+        return Email._unchecked(address)
 
     @property
     def address(self):
@@ -56,13 +82,15 @@ class Phone:
     Phone number. The phone number, including the country code and extension number,
     cannot be changed - they are involved in the __hash__ function.
     """
+    __slots__ = ('_int_code', '_number', '_ext_code')
+
     def __init__(self, int_code: int, number: str, ext_code: str = None):
         self._int_code = int_code
-        self._number = re.sub(r'\D', '', number)
+        self._number = _RE_NON_DIGIT.sub('', number)
         self._ext_code = ext_code
 
     def __str__(self):
-        phone_number = re.sub(r"(\d{3})(\d{3})(\d{2})(\d{2})", "(\\1)\\2-\\3-\\4", self._number)
+        phone_number = _RE_PHONE_FMT.sub('(\\1)\\2-\\3-\\4', self._number)
         ext_code = f' доб.{self.ext_code}' if self.ext_code else ''
         return f'+{self.int_code}{phone_number}{ext_code}'
 
@@ -75,7 +103,21 @@ class Phone:
         return False
 
     def __hash__(self):
-        return hash(f'{self._int_code}{self._number}{self._ext_code}')
+        return hash((self._int_code, self._number, self._ext_code))
+
+    @classmethod
+    def _unchecked(cls, int_code: int, number: str, ext_code: str = None):
+        """
+        :param int_code: international code
+        :param number: the phone number that contains only digits
+        :param ext_code: extension code
+        :return: Phone instance created without cleaning the number
+        """
+        phone = cls.__new__(cls)
+        phone._int_code = int_code
+        phone._number = number
+        phone._ext_code = ext_code
+        return phone
 
     @staticmethod
     def parse_ru(number: str):
@@ -86,10 +128,9 @@ class Phone:
         match = RE_PHONE.search(number)
         if not match:
             return
-        phone_number = re.sub(r'\D', '', match.group(2))
-        if len(match.groups()) > 4:
-            ext_code = match.group(5)
-        return Phone(7, phone_number, ext_code)
+        # group 2 consists only of digits and separators, so a plain filter is enough here
+        phone_number = ''.join(filter(str.isdigit, match[2]))
+        return Phone._unchecked(7, phone_number, match[5])
 
     @property
     def int_code(self):
@@ -108,6 +149,8 @@ class Contact:
     """
     Stores contact information
     """
+    __slots__ = ('first_name', 'last_name', 'surname', 'org', 'position', 'phone', 'email')
+
     def __init__(self, first_name: str, last_name: str, surname: str = None, org: str = None, position: str = None,
                  phone: Phone = None, email: Email = None):
         """
@@ -128,16 +171,18 @@ class Contact:
         self.email = email
 
     def __str__(self):
-        result = ' '.join([self.last_name.title(), self.first_name.title(), self.surname.title()])
+        parts = [self.last_name.title(), ' ', self.first_name.title()]
+        if self.surname:
+            parts += (' ', self.surname.title())
         if self.position:
-            result += f', {self.position}'
+            parts += (', ', self.position)
         if self.org:
-            result += f'({self.org})'
+            parts += ('(', self.org, ')')
         if self.phone:
-            result += f', {self.phone}'
+            parts += (', ', str(self.phone))
         if self.email:
-            result += f' [{self.email}]'
-        return result
+            parts += (' [', str(self.email), ']')
+        return ''.join(parts)
 
 
 class Phonebook:
@@ -146,50 +191,64 @@ class Phonebook:
     """
     def __init__(self):
         self._list = []
-        self._hash = {}
+        self._by_name = {}
+        self._by_email = {}
+        self._by_phone = {}
 
         self.conflicts = []
 
     @property
     def list(self):
-        return list(self._list[:])
+        return self._list.copy()
 
     def add(self, contact: Contact):
         """
         :param contact: the contact being added
         :return: True if there were no conflicts, if returned False - the conflict is added to the conflicts list
         """
-        if duplicate := (self._hash.get(contact.email) or self._hash.get(contact.phone)):
+        name_key = (contact.last_name, contact.first_name)
+        email, phone = contact.email, contact.phone
+        email_key = email.address if email is not None else None
+        phone_key = (phone.int_code, phone.number, phone.ext_code) if phone is not None else None
+        duplicate = self._by_email.get(email_key)
+        if duplicate is None:
+            duplicate = self._by_phone.get(phone_key)
+        if duplicate is not None:
             self.conflicts.append(PhonebookConflict(self, duplicate, contact))
             return False
-        if duplicate := self._hash.get(contact.last_name + contact.first_name):
+        duplicate = self._by_name.get(name_key)
+        if duplicate is not None:
             if not duplicate.surname or not contact.surname or duplicate.surname == contact.surname:
                 self.conflicts.append(PhonebookConflict(self, duplicate, contact))
                 return False
         self._list.append(contact)
-        if contact.email:
-            self._hash[contact.email] = contact
-        if contact.phone:
-            self._hash[contact.phone] = contact
-        self._hash[contact.last_name + contact.first_name] = contact
-        return Contact
+        if email_key is not None:
+            self._by_email[email_key] = contact
+        if phone_key is not None:
+            self._by_phone[phone_key] = contact
+        self._by_name[name_key] = contact
+        return True
 
     def load_csv_file(self, path: str):
         """
         :param path: path to the csv file
         :return: None
         """
-        with open(path, encoding='utf-8', newline='') as f:
-            for row in islice(csv.reader(f, delimiter=","), 1, None):
-                full_name = ' '.join(row[:3]).strip().split(' ')
-                self.add(Contact(
+        add, parse_phone, parse_email = self.add, Phone.parse_ru, Email.parse
+        with open(path, encoding='utf-8', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(f, delimiter=",")
+            next(reader, None)
+            for row in reader:
+                # the full name may be written entirely in the first column, so the columns are re-split
+                full_name = ' '.join(row[:3]).split()
+                add(Contact(
                     last_name=full_name[0] if len(full_name) else None,
                     first_name=full_name[1] if len(full_name) > 1 else None,
                     surname=full_name[2] if len(full_name) > 2 else None,
-                    org=row[3].strip() if len(row[3].strip()) else None,
-                    position=row[4].strip() if len(row[4].strip()) else None,
-                    phone=Phone.parse_ru(row[5]),
-                    email=Email.parse(row[6])
+                    org=row[3].strip() or None,
+                    position=row[4].strip() or None,
+                    phone=parse_phone(row[5]),
+                    email=parse_email(row[6])
                 ))
 
     def save_csv_file(self, path: str):
@@ -199,12 +258,54 @@ class Phonebook:
         """
         if not path.endswith('.csv'):
             path += '.csv'
-        csv_header = ['lastname', 'firstname', 'surname', 'organization', 'position', 'phone', 'email']
         with open(path, 'w', encoding='utf-8', newline='') as f:
-            csv.writer(f, ).writerows([csv_header] + [
-                [item.last_name, item.first_name, item.surname, item.org, item.position, item.phone, item.email]
-                for item in self._list
-            ])
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(map(_contact_row, self._list))
+
+    def save_msgpack(self, path: str):
+        """
+        Saves contacts to a binary snapshot that is loaded without parsing and validation.
+        :param path: path to the msgpack file
+        :return: None
+        """
+        if msgpack is None:
+            raise Exception('msgpack is not installed!')
+        if not path.endswith('.msgpack'):
+            path += '.msgpack'
+        rows = []
+        for item in self._list:
+            phone, email = item.phone, item.email
+            rows.append((
+                item.last_name, item.first_name, item.surname, item.org, item.position,
+                phone.int_code if phone is not None else None,
+                phone.number if phone is not None else None,
+                phone.ext_code if phone is not None else None,
+                email.address if email is not None else None
+            ))
+        with open(path, 'wb') as f:
+            msgpack.pack(rows, f)
+
+    def load_msgpack(self, path: str):
+        """
+        :param path: path to the msgpack file created by save_msgpack
+        :return: None
+        """
+        if msgpack is None:
+            raise Exception('msgpack is not installed!')
+        with open(path, 'rb') as f:
+            rows = msgpack.unpack(f)
+        add, new_phone, new_email = self.add, Phone._unchecked, Email._unchecked
+        for last_name, first_name, surname, org, position, int_code, number, ext_code, address in rows:
+            add(Contact(
+                last_name=last_name,
+                first_name=first_name,
+                surname=surname,
+                org=org,
+                position=position,
+                phone=new_phone(int_code, number, ext_code) if number is not None else None,
+                email=new_email(address) if address is not None else None
+            ))
 
 
 class PhonebookConflict:
@@ -212,32 +313,39 @@ class PhonebookConflict:
     In case of a conflict when adding a new contact, this class is used.
     In which source is the original contact, and dest is a duplicate record.
     """
+    __slots__ = ('phonebook', 'source', 'dest', 'resolved')
+
     def __init__(self, pb: Phonebook, source: Contact, dest: Contact):
         self.phonebook = pb
         self.source = source
         self.dest = dest
         self.resolved = False
 
-    def merge(self, ignore: list = []):
+    def merge(self, ignore: frozenset = frozenset()):
         """
         :param ignore: these attributes will not be overwritten,
         there may be a first_name, last_name, surname, org, position, phone or email.
         :return: Overwrites the attributes of the original contact if they are specified in the duplicate.
         Marks the resolved property to True, returns None.
         """
-        for key in ['first_name', 'last_name', 'surname', 'org', 'position', 'phone', 'email']:
-            new_value = self.dest.__getattribute__(key)
-            if key in ignore or not new_value or new_value == self.source.__getattribute__(key):
+        source, dest = self.source, self.dest
+        for key in ('first_name', 'last_name', 'surname', 'org', 'position', 'phone', 'email'):
+            if key in ignore:
                 continue
-            self.source.__setattr__(key, new_value)
+            new_value = getattr(dest, key)
+            if new_value and new_value != getattr(source, key):
+                setattr(source, key, new_value)
         self.resolved = True
 
 
 if __name__ == '__main__':
     phonebook = Phonebook()
     phonebook.load_csv_file('phonebook_raw.csv')
+    messages = []
     for conflict in phonebook.conflicts:
-        logging.warning(f' Duplicate contact found: {conflict.source}')
+        messages.append(f' Duplicate contact found: {conflict.source}')
         conflict.merge()
-        logging.warning(f' Contact information changed to: {conflict.source}')
+        messages.append(f' Contact information changed to: {conflict.source}')
+    if messages:
+        logging.warning('\n'.join(messages))
     phonebook.save_csv_file('phonebook.csv')